@@ -15,28 +15,203 @@ Point = namedtuple("Point", "X Y")
 BLACK_CHESSMAN = Chessman("", 1, (45, 45, 45))
 WHITE_CHESSMAN = Chessman("", 2, (219, 219, 219))
 
+# õĹ̶
+BENCH_OPENING = [
+    (BLACK_CHESSMAN, Point(9, 9)),
+    (WHITE_CHESSMAN, Point(10, 10)),
+    (BLACK_CHESSMAN, Point(10, 8)),
+    (WHITE_CHESSMAN, Point(8, 10)),
+    (BLACK_CHESSMAN, Point(11, 9)),
+    (WHITE_CHESSMAN, Point(9, 11)),
+]
+
 offset = [(1, 0), (0, 1), (1, 1), (1, -1)]
 
+# AI ֱǰ׺ Opp ʾԷͣOpen/Half ʾ赲/һ赲
+# GapDivisor Ϊпոʱۼ
+Weights = namedtuple(
+    "Weights",
+    "Four OppFour OpenThree HalfThree OppOpenThree OppHalfThree "
+    "OpenTwo HalfTwo OppOpenTwo OppHalfTwo One OppOne GapDivisor",
+)
+
+DEFAULT_WEIGHTS = Weights(
+    Four=10000,
+    OppFour=9000,
+    OpenThree=1000,
+    HalfThree=100,
+    OppOpenThree=900,
+    OppHalfThree=90,
+    OpenTwo=100,
+    HalfTwo=10,
+    OppOpenTwo=90,
+    OppHalfTwo=9,
+    One=10,
+    OppOne=9,
+    GapDivisor=2,
+)
+
+
+# ѡ뾶ֻǾӲֵĿλ
+NEAR_DISTANCE = 2
+
+# Zobrist ̱߳棻ʹù̶ӣ֤ͬͬһĹϣֵһ
+_zobrist_tables = {}
+
+
+def _get_zobrist_table(line_points):
+    table = _zobrist_tables.get(line_points)
+    if table is None:
+        rng = random.Random(0x5EED + line_points)
+        table = {
+            value: [[rng.getrandbits(64) for _ in range(line_points)] for _ in range(line_points)]
+            for value in (BLACK_CHESSMAN.Value, WHITE_CHESSMAN.Value)
+        }
+        _zobrist_tables[line_points] = table
+    return table
+
+
+class Position:
+    """
+    棺̡ջZobrist ϣȫͨ make/unmake ά
+    CheckerboardAI 湲ͬһ Position塢̺ٸ̡
+    """
+
+    def __init__(self, line_points):
+        self._line_points = line_points
+        self._board = [[0] * line_points for _ in range(line_points)]
+        # ջÿԪΪ(chessman, point)Ԫ
+        self._moves = []
+        self._key = 0
+        self._zobrist = _get_zobrist_table(line_points)
+        # ÿΧ NEAR_DISTANCE Χڵڿɺѡ
+        self._near = [[0] * line_points for _ in range(line_points)]
+
+    def _get_board(self):
+        return self._board
+
+    def _get_moves(self):
+        return self._moves
+
+    def _get_key(self):
+        return self._key
+
+    def _get_line_points(self):
+        return self._line_points
+
+    board = property(_get_board)
+    moves = property(_get_moves)
+    key = property(_get_key)
+    line_points = property(_get_line_points)
+
+    def is_empty(self, point):
+        return self._board[point.Y][point.X] == 0
+
+    def make(self, chessman, point):
+        """
+        Ӳ¹ϣ
+        :param chessman:
+        :param point:λ
+        """
+        self._board[point.Y][point.X] = chessman.Value
+        self._moves.append((chessman, point))
+        self._key ^= self._zobrist[chessman.Value][point.Y][point.X]
+        self._update_near(point, 1)
+
+    def unmake(self):
+        """
+        һ make
+        :return: (chessman, point)ջΪʱ None
+        """
+        if not self._moves:
+            return None
+        chessman, point = self._moves.pop()
+        self._board[point.Y][point.X] = 0
+        self._key ^= self._zobrist[chessman.Value][point.Y][point.X]
+        self._update_near(point, -1)
+        return chessman, point
+
+    def _update_near(self, point, delta):
+        n = self._line_points
+        for y in range(max(0, point.Y - NEAR_DISTANCE), min(n, point.Y + NEAR_DISTANCE + 1)):
+            row = self._near[y]
+            for x in range(max(0, point.X - NEAR_DISTANCE), min(n, point.X + NEAR_DISTANCE + 1)):
+                row[x] += delta
+
+    def candidates(self):
+        """ؿӵĿλʱԪ"""
+        if not self._moves:
+            center = self._line_points // 2
+            return [Point(center, center)]
+        board = self._board
+        near = self._near
+        return [
+            Point(x, y)
+            for y in range(self._line_points)
+            for x in range(self._line_points)
+            if near[y][x] and board[y][x] == 0
+        ]
+
+    # жϸõӺǷ
+    def is_win(self, point):
+        cur_value = self._board[point.Y][point.X]
+        for os in offset:
+            if self._get_count_on_direction(point, cur_value, os[0], os[1]):
+                return True
+        return False
+
+    def _get_count_on_direction(self, point, value, x_offset, y_offset):
+        count = 1
+        for step in range(1, 5):
+            x = point.X + step * x_offset
+            y = point.Y + step * y_offset
+            if (
+                0 <= x < self._line_points
+                and 0 <= y < self._line_points
+                and self._board[y][x] == value
+            ):
+                count += 1
+            else:
+                break
+        for step in range(1, 5):
+            x = point.X - step * x_offset
+            y = point.Y - step * y_offset
+            if (
+                0 <= x < self._line_points
+                and 0 <= y < self._line_points
+                and self._board[y][x] == value
+            ):
+                count += 1
+            else:
+                break
+
+        return count >= 5
+
 
 class Checkerboard:
     def __init__(self, line_points):
         self._line_points = line_points
-        self._checkerboard = [[0] * line_points for _ in range(line_points)]
-        # ¼ʷÿԪΪ(chessman, point)Ԫ
+        # ǰʾľ棬 AI 
+        self._position = Position(line_points)
+        # ¼ʷÿԪΪ(chessman, point)Ԫ飻ʱʷ
         self._history = []
 
     def _get_checkerboard(self):
-        return self._checkerboard
-        
+        return self._position.board
+
     def _get_history(self):
         return self._history
-        
+
+    def _get_position(self):
+        return self._position
+
     checkerboard = property(_get_checkerboard)
     history = property(_get_history)
+    position = property(_get_position)
 
     # жǷ
     def can_drop(self, point):
-        return self._checkerboard[point.Y][point.X] == 0
+        return self._position.is_empty(point)
 
     def drop(self, chessman, point):
         """
@@ -46,7 +221,7 @@ class Checkerboard:
         :return:֮󼴿ɻʤ򷵻ػʤ򷵻 None
         """
         print(f"{chessman.Name} ({point.X}, {point.Y})")
-        self._checkerboard[point.Y][point.X] = chessman.Value
+        self._position.make(chessman, point)
         self._history.append((chessman, point))
 
         if self._win(point):
@@ -56,8 +231,8 @@ class Checkerboard:
     def undo(self):
         """һ"""
         if self._history:
-            last_move = self._history.pop()
-            self._checkerboard[last_move[1].Y][last_move[1].X] = 0
+            self._history.pop()
+            self._position.unmake()
             return True
         return False
 
@@ -69,50 +244,19 @@ class Checkerboard:
         """
         if step < 0 or step > len(self._history):
             return False
-            
-        # 
-        self._checkerboard = [[0] * self._line_points for _ in range(self._line_points)]
-        
-        # µָ
-        for i in range(step):
-            chessman, point = self._history[i]
-            self._checkerboard[point.Y][point.X] = chessman.Value
-            
+
+        # ֻµǰĿ경֮
+        while len(self._position.moves) > step:
+            self._position.unmake()
+        while len(self._position.moves) < step:
+            chessman, point = self._history[len(self._position.moves)]
+            self._position.make(chessman, point)
+
         return True
 
     # жǷӮ
     def _win(self, point):
-        cur_value = self._checkerboard[point.Y][point.X]
-        for os in offset:
-            if self._get_count_on_direction(point, cur_value, os[0], os[1]):
-                return True
-
-    def _get_count_on_direction(self, point, value, x_offset, y_offset):
-        count = 1
-        for step in range(1, 5):
-            x = point.X + step * x_offset
-            y = point.Y + step * y_offset
-            if (
-                0 <= x < self._line_points
-                and 0 <= y < self._line_points
-                and self._checkerboard[y][x] == value
-            ):
-                count += 1
-            else:
-                break
-        for step in range(1, 5):
-            x = point.X - step * x_offset
-            y = point.Y - step * y_offset
-            if (
-                0 <= x < self._line_points
-                and 0 <= y < self._line_points
-                and self._checkerboard[y][x] == value
-            ):
-                count += 1
-            else:
-                break
-
-        return count >= 5
+        return self._position.is_win(point)
 
 
 SIZE = 30  # ÿʱļ
@@ -168,7 +312,13 @@ def print_text(screen, font, x, y, text, fcolor=(255, 255, 255)):
     screen.blit(imgText, (x, y))
 
 
-def main():
+def main(ai_factory=None):
+    """
+    ˻սѭ
+    :param ai_factory: ҵĿɵö󣬲 AI ͬĬʹ AI
+    """
+    if ai_factory is None:
+        ai_factory = AI
     pygame.init()
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("")
@@ -181,7 +331,7 @@ def main():
     checkerboard = Checkerboard(Line_Points)
     cur_runner = BLACK_CHESSMAN
     winner = None
-    computer = AI(Line_Points, WHITE_CHESSMAN)
+    computer = ai_factory(Line_Points, WHITE_CHESSMAN, checkerboard.position)
 
     black_win_count = 0
     white_win_count = 0
@@ -215,6 +365,7 @@ def main():
     while True:
         for event in pygame.event.get():
             if event.type == QUIT:
+                computer.close()
                 sys.exit()
             elif event.type == KEYDOWN:
                 if event.key == K_RETURN:
@@ -222,7 +373,8 @@ def main():
                         winner = None
                         cur_runner = BLACK_CHESSMAN
                         checkerboard = Checkerboard(Line_Points)
-                        computer = AI(Line_Points, WHITE_CHESSMAN)
+                        computer.close()
+                        computer = ai_factory(Line_Points, WHITE_CHESSMAN, checkerboard.position)
                         replay_mode = False
                         current_step = 0
                         auto_replay = False
@@ -230,9 +382,7 @@ def main():
                     if winner is None and not replay_mode:
                         # Ҫҵһ͵Եһ
                         if checkerboard.undo():  # Եһ
-                            computer.reset_checkerboard(checkerboard.checkerboard)
-                            if checkerboard.undo():  # ҵһ
-                                computer.reset_checkerboard(checkerboard.checkerboard)
+                            checkerboard.undo()  # ҵһ
                 elif event.key == K_r:  # R븴ģʽ
                     if winner is not None:
                         replay_mode = True
@@ -251,21 +401,17 @@ def main():
                     if is_point_in_rect(mouse_pos, replay_buttons['start']):
                         current_step = 0
                         checkerboard.replay_to(current_step)
-                        computer.reset_checkerboard(checkerboard.checkerboard)
                     elif is_point_in_rect(mouse_pos, replay_buttons['prev']):
                         if current_step > 0:
                             current_step -= 1
                             checkerboard.replay_to(current_step)
-                            computer.reset_checkerboard(checkerboard.checkerboard)
                     elif is_point_in_rect(mouse_pos, replay_buttons['next']):
                         if current_step < len(checkerboard.history):
                             current_step += 1
                             checkerboard.replay_to(current_step)
-                            computer.reset_checkerboard(checkerboard.checkerboard)
                     elif is_point_in_rect(mouse_pos, replay_buttons['end']):
                         current_step = len(checkerboard.history)
                         checkerboard.replay_to(current_step)
-                        computer.reset_checkerboard(checkerboard.checkerboard)
                     elif is_point_in_rect(mouse_pos, replay_buttons['auto']):
                         auto_replay = not auto_replay
                         if auto_replay:
@@ -279,7 +425,6 @@ def main():
                                 winner = checkerboard.drop(cur_runner, click_point)
                                 if winner is None:
                                     cur_runner = _get_next(cur_runner)
-                                    computer.get_opponent_drop(click_point)
                                     AI_point = computer.AI_drop()
                                     winner = checkerboard.drop(cur_runner, AI_point)
                                     if winner is not None:
@@ -397,7 +542,6 @@ def main():
             if current_time - auto_replay_timer >= auto_replay_interval:
                 current_step += 1
                 checkerboard.replay_to(current_step)
-                computer.reset_checkerboard(checkerboard.checkerboard)
                 auto_replay_timer = current_time
                 
                 # һֹͣԶ
@@ -592,22 +736,31 @@ def _get_clickpoint(click_pos):
 
 
 class AI:
-    def __init__(self, line_points, chessman):
+    def __init__(self, line_points, chessman, position=None, weights=None):
         self._line_points = line_points
         self._my = chessman
+        # ֱĬʹ DEFAULT_WEIGHTS
+        self._weights = DEFAULT_WEIGHTS if weights is None else weights
         self._opponent = (
             BLACK_CHESSMAN if chessman == WHITE_CHESSMAN else WHITE_CHESSMAN
         )
-        self._checkerboard = [[0] * line_points for _ in range(line_points)]
+        # 빲ʱɾĳߣCheckerboardӣ AI Լάһݾ
+        self._owns_position = position is None
+        self._position = Position(line_points) if position is None else position
+        self._checkerboard = self._position.board
+
+    def _get_position(self):
+        return self._position
+
+    position = property(_get_position)
 
     def get_opponent_drop(self, point):
-        self._checkerboard[point.Y][point.X] = self._opponent.Value
-        
-    def reset_checkerboard(self, checkerboard):
-        """AI״̬ڸģʽ"""
-        for i in range(self._line_points):
-            for j in range(self._line_points):
-                self._checkerboard[i][j] = checkerboard[i][j]
+        if self._owns_position:
+            self._position.make(self._opponent, point)
+
+    def close(self):
+        """ͷŽ̳ءڴԴ AI ûҪͷŵԴ"""
+        pass
 
     def AI_drop(self):
         point = None
@@ -623,7 +776,8 @@ class AI:
                         r = random.randint(0, 100)
                         if r % 2 == 0:
                             point = Point(i, j)
-        self._checkerboard[point.Y][point.X] = self._my.Value
+        if self._owns_position:
+            self._position.make(self._my, point)
         return point
 
     def _get_point_score(self, point):
@@ -725,47 +879,48 @@ class AI:
                         _both += 1
 
         score = 0
+        weights = self._weights
         if count == 4:
-            score = 10000
+            score = weights.Four
         elif _count == 4:
-            score = 9000
+            score = weights.OppFour
         elif count == 3:
             if both == 0:
-                score = 1000
+                score = weights.OpenThree
             elif both == 1:
-                score = 100
+                score = weights.HalfThree
             else:
                 score = 0
         elif _count == 3:
             if _both == 0:
-                score = 900
+                score = weights.OppOpenThree
             elif _both == 1:
-                score = 90
+                score = weights.OppHalfThree
             else:
                 score = 0
         elif count == 2:
             if both == 0:
-                score = 100
+                score = weights.OpenTwo
             elif both == 1:
-                score = 10
+                score = weights.HalfTwo
             else:
                 score = 0
         elif _count == 2:
             if _both == 0:
-                score = 90
+                score = weights.OppOpenTwo
             elif _both == 1:
-                score = 9
+                score = weights.OppHalfTwo
             else:
                 score = 0
         elif count == 1:
-            score = 10
+            score = weights.One
         elif _count == 1:
-            score = 9
+            score = weights.OppOne
         else:
             score = 0
 
         if space or _space:
-            score /= 2
+            score /= weights.GapDivisor
 
         return score
 
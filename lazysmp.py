@@ -0,0 +1,499 @@
+# -*- coding: gbk -*-
+
+# Lazy SMP  alpha-beta ͬһ棬
+# ͨ multiprocessing.shared_memory еûʱ䵽ʱȡɽ
+
+import os
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import gobang
+from gobang import (
+    AI,
+    BENCH_OPENING,
+    DEFAULT_WEIGHTS,
+    BLACK_CHESSMAN,
+    WHITE_CHESSMAN,
+    Line_Points,
+    Point,
+    Position,
+    _get_next,
+)
+
+TT_BITS = 18  # ûСΪ 2 ** TT_BITS ÿ 16 ֽ
+MAX_BRANCH = 10  # ÿڵֻߵɺѡ
+DEFAULT_MAX_DEPTH = 8
+DEFAULT_TIME_LIMIT = 2.0
+WIN_SCORE = 1000000
+ORDER_NOISE = 0.1  # ߷Ŷ
+
+# ûı߽
+EXACT, LOWER, UPPER = 0, 1, 2
+
+_MASK64 = (1 << 64) - 1
+_SCORE_OFFSET = 1 << 31
+
+
+class SharedTranspositionTable:
+    """
+    ڴûÿ 64 λ (key ^ data, data)
+    ȡʱ key ^ data У飬дһУʧܶ
+    :param shared: False ʱýڵ bytearrayռùڴ
+    """
+
+    def __init__(self, bits=TT_BITS, name=None, shared=True):
+        size = (1 << bits) * 16
+        self._shm = None
+        self._owner = False
+        if not shared:
+            self._buffer = memoryview(bytearray(size))
+        elif name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            self._owner = True
+            self._buffer = self._shm.buf
+        else:
+            # ֻӣɴ߸ unlink
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._buffer = self._shm.buf
+        self._bits = bits
+        self._mask = (1 << bits) - 1
+        self._table = self._buffer.cast("Q")
+
+    def _get_name(self):
+        return None if self._shm is None else self._shm.name
+
+    def _get_bits(self):
+        return self._bits
+
+    name = property(_get_name)
+    bits = property(_get_bits)
+
+    def probe(self, key):
+        """
+        :return: (depth, flag, score, move_index)δз Nonemove_index Ϊ -1 ʾûŷ
+        """
+        index = (key & self._mask) * 2
+        data = self._table[index + 1]
+        # data Ϊ 0 ǴδдĿ
+        if data == 0 or self._table[index] ^ data != key:
+            return None
+        score = (data & 0xFFFFFFFF) - _SCORE_OFFSET
+        depth = (data >> 32) & 0xFF
+        flag = (data >> 40) & 0x3
+        move_index = ((data >> 42) & 0xFFFF) - 1
+        return depth, flag, score, move_index
+
+    def store(self, key, depth, flag, score, move_index):
+        index = (key & self._mask) * 2
+        old_data = self._table[index + 1]
+        # 滻ͬһֻ½ʱǣֱͬӸ
+        if self._table[index] ^ old_data == key and ((old_data >> 32) & 0xFF) > depth:
+            return
+        data = (
+            (int(score) + _SCORE_OFFSET)
+            | (depth << 32)
+            | (flag << 40)
+            | ((move_index + 1) << 42)
+        )
+        self._table[index] = (key ^ data) & _MASK64
+        self._table[index + 1] = data
+
+    def clear(self):
+        self._buffer[:] = bytes(len(self._buffer))
+
+    def close(self):
+        self._table.release()
+        if self._shm is None:
+            return
+        self._buffer = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class _Timeout(Exception):
+    pass
+
+
+class AlphaBetaSearch:
+    """
+     negamax alpha-beta ̽Ӷͨ Position.make/unmake 
+    :param noise: ߷ŶLazy SMP ĸͬķ֧
+    """
+
+    def __init__(self, position, tt, weights=None, noise=0.0, seed=None):
+        self._position = position
+        self._tt = tt
+        self._noise = noise
+        self._random = random.Random(seed)
+        if weights is None:
+            weights = DEFAULT_WEIGHTS
+        line_points = position.line_points
+        # ߷֣ӷأҶڵֻƼ͵Ľ֮
+        attack = weights._replace(
+            OppFour=0, OppOpenThree=0, OppHalfThree=0, OppOpenTwo=0, OppHalfTwo=0, OppOne=0
+        )
+        self._orderers = {
+            c.Value: AI(line_points, c, position, weights) for c in (BLACK_CHESSMAN, WHITE_CHESSMAN)
+        }
+        self._attackers = {
+            c.Value: AI(line_points, c, position, attack) for c in (BLACK_CHESSMAN, WHITE_CHESSMAN)
+        }
+        self._deadline = None
+        self._stop = None
+        self.nodes = 0
+
+    def iterate(self, chessman, max_depth, start_depth=1, time_limit=None, stop=None, on_depth=None):
+        """
+        
+        :param stop:  True ʱֹͣĿɵö
+        :param on_depth: ÿһ on_depth(depth, point, score)
+        :return: һ(depth, point, score)һҲδʱ None
+        """
+        self._deadline = None if time_limit is None else time.perf_counter() + time_limit
+        self._stop = stop
+        result = None
+        try:
+            for depth in range(start_depth, max_depth + 1):
+                score, point = self._search_root(chessman, depth)
+                result = (depth, point, score)
+                if on_depth is not None:
+                    on_depth(depth, point, score)
+                if abs(score) >= WIN_SCORE:
+                    break
+        except _Timeout:
+            pass
+        return result
+
+    def _check_time(self):
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise _Timeout()
+        if self._stop is not None and self.nodes & 63 == 0 and self._stop():
+            raise _Timeout()
+
+    def _ordered_moves(self, chessman, tt_move_index):
+        line_points = self._position.line_points
+        orderer = self._orderers[chessman.Value]
+        scored = []
+        for p in self._position.candidates():
+            score = orderer._get_point_score(p)
+            if self._noise:
+                score *= 1 + self._random.random() * self._noise
+            if p.Y * line_points + p.X == tt_move_index:
+                score = float("inf")
+            scored.append((score, p))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [p for _, p in scored[:MAX_BRANCH]]
+
+    def _evaluate(self, chessman):
+        moves = self._position.candidates()
+        if not moves:
+            return 0
+        my = self._attackers[chessman.Value]
+        opponent = self._attackers[_get_next(chessman).Value]
+        return int(max(map(my._get_point_score, moves)) - max(map(opponent._get_point_score, moves)))
+
+    def _search_root(self, chessman, depth):
+        position = self._position
+        line_points = position.line_points
+        entry = self._tt.probe(position.key)
+        moves = self._ordered_moves(chessman, entry[3] if entry else -1)
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_point = moves[0]
+        for point in moves:
+            position.make(chessman, point)
+            try:
+                if position.is_win(point):
+                    score = WIN_SCORE
+                else:
+                    score = -self._negamax(_get_next(chessman), depth - 1, -beta, -alpha)
+            finally:
+                position.unmake()
+            if score > alpha:
+                alpha = score
+                best_point = point
+        self._tt.store(position.key, depth, EXACT, alpha, best_point.Y * line_points + best_point.X)
+        return alpha, best_point
+
+    def _negamax(self, chessman, depth, alpha, beta):
+        self.nodes += 1
+        self._check_time()
+        position = self._position
+        key = position.key
+        alpha_orig = alpha
+
+        tt_move_index = -1
+        entry = self._tt.probe(key)
+        if entry is not None:
+            tt_depth, flag, score, tt_move_index = entry
+            if tt_depth >= depth:
+                if flag == EXACT:
+                    return score
+                if flag == LOWER:
+                    alpha = max(alpha, score)
+                elif flag == UPPER:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        if depth == 0:
+            return self._evaluate(chessman)
+
+        moves = self._ordered_moves(chessman, tt_move_index)
+        if not moves:
+            return 0  # 
+
+        best = -WIN_SCORE - 1
+        best_point = None
+        for point in moves:
+            position.make(chessman, point)
+            try:
+                if position.is_win(point):
+                    score = WIN_SCORE
+                else:
+                    score = -self._negamax(_get_next(chessman), depth - 1, -beta, -alpha)
+            finally:
+                position.unmake()
+            if score > best:
+                best = score
+                best_point = point
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self._tt.store(key, depth, flag, best, best_point.Y * position.line_points + best_point.X)
+        return best
+
+
+# ֣з 64 λ[ֹͣ־, ÿ (, ѵ, , ڵ)]
+_CONTROL_FIELDS = 4
+
+_attached = {}
+
+
+def _attach(tt_name, tt_bits, control_name):
+    # ÿֻһιڴ棬µĹڴʱͷžɵ
+    if tt_name not in _attached:
+        for tt, control_shm, control in _attached.values():
+            control.release()
+            control_shm.close()
+            tt.close()
+        _attached.clear()
+        control_shm = shared_memory.SharedMemory(name=control_name)
+        _attached[tt_name] = (
+            SharedTranspositionTable(tt_bits, tt_name), control_shm, control_shm.buf.cast("q")
+        )
+    return _attached[tt_name]
+
+
+def _smp_worker(tt_name, tt_bits, control_name, *args):
+    """̳е̣ӹڴִ _run_search"""
+    tt, _, control = _attach(tt_name, tt_bits, control_name)
+    return _run_search(tt, control, *args)
+
+
+def _run_search(tt, control, worker_id, line_points, moves, chessman, max_depth, time_limit, weights):
+    """
+    Lazy SMP еһ̡Ž̴ӵ 2 㿪ʼ̴߷
+    :return: [(, ʱ)] ڵ
+    """
+    position = Position(line_points)
+    for c, p in moves:
+        position.make(c, p)
+    search = AlphaBetaSearch(
+        position, tt, weights,
+        noise=ORDER_NOISE if worker_id else 0.0,
+        seed=worker_id,
+    )
+    base = 1 + worker_id * _CONTROL_FIELDS
+    start = time.perf_counter()
+    depth_times = []
+
+    def on_depth(depth, point, score):
+        depth_times.append((depth, time.perf_counter() - start))
+        control[base] = depth
+        control[base + 1] = point.Y * line_points + point.X
+        control[base + 2] = int(score)
+        control[base + 3] = search.nodes
+
+    search.iterate(
+        chessman, max_depth,
+        start_depth=1 + worker_id % 2,
+        time_limit=time_limit,
+        stop=lambda: control[0] != 0,
+        on_depth=on_depth,
+    )
+    control[base + 3] = search.nodes
+    return depth_times, search.nodes
+
+
+class LazySMPAI(AI):
+    """
+     alpha-beta ңֱ滻 AI
+    :param workers: 1 ʾڵǰ
+    :param time_limit: ÿ˼ʱ䣨룩
+    :param max_depth: 
+    """
+
+    def __init__(self, line_points, chessman, position=None, workers=1,
+                 time_limit=DEFAULT_TIME_LIMIT, max_depth=DEFAULT_MAX_DEPTH,
+                 weights=None, verbose=True):
+        super().__init__(line_points, chessman, position, weights)
+        self._workers = max(1, workers)
+        self._time_limit = time_limit
+        self._max_depth = max_depth
+        self._verbose = verbose
+        # ʱûͿڽڣռ /dev/shm
+        control_size = 8 * (1 + _CONTROL_FIELDS * self._workers)
+        if self._workers == 1:
+            self._tt = SharedTranspositionTable(shared=False)
+            self._control_shm = None
+            self._control = memoryview(bytearray(control_size)).cast("q")
+        else:
+            self._tt = SharedTranspositionTable()
+            self._control_shm = shared_memory.SharedMemory(create=True, size=control_size)
+            self._control = self._control_shm.buf.cast("q")
+        self._executor = None
+        self.last_depth = 0
+        self.last_nodes = 0
+        self.last_elapsed = 0.0
+        self.last_depth_times = {}
+
+    def AI_drop(self):
+        for i in range(len(self._control)):
+            self._control[i] = 0
+        start = time.perf_counter()
+        moves = list(self._position.moves)
+        args = [
+            (worker_id, self._line_points, moves, self._my, self._max_depth,
+             self._time_limit, self._weights)
+            for worker_id in range(self._workers)
+        ]
+        if self._workers == 1:
+            results = [_run_search(self._tt, self._control, *args[0])]
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self._workers)
+            futures = [
+                self._executor.submit(
+                    _smp_worker, self._tt.name, self._tt.bits, self._control_shm.name, *a
+                )
+                for a in args
+            ]
+            # ʱ䵽֪ͨнֹͣȡɵ
+            wait(futures, timeout=self._time_limit)
+            self._control[0] = 1
+            results = [future.result() for future in futures]
+        self.last_elapsed = time.perf_counter() - start
+
+        self.last_depth_times = {}
+        for depth_times, _ in results:
+            for depth, seconds in depth_times:
+                if depth not in self.last_depth_times or seconds < self.last_depth_times[depth]:
+                    self.last_depth_times[depth] = seconds
+        self.last_nodes = sum(nodes for _, nodes in results)
+
+        best_worker = max(
+            range(self._workers),
+            key=lambda w: self._control[1 + w * _CONTROL_FIELDS],
+        )
+        base = 1 + best_worker * _CONTROL_FIELDS
+        self.last_depth = self._control[base]
+        if self.last_depth == 0:
+            # һҲû꣬˻̰
+            return super().AI_drop()
+        index = self._control[base + 1]
+        point = Point(index % self._line_points, index // self._line_points)
+
+        if self._verbose:
+            print(f"Lazy SMP:  {self.last_depth}, {self.last_nodes} ڵ, "
+                  f"{self.nodes_per_second():.0f} ڵ/")
+        if self._owns_position:
+            self._position.make(self._my, point)
+        return point
+
+    def nodes_per_second(self):
+        if self.last_elapsed <= 0:
+            return 0.0
+        return self.last_nodes / self.last_elapsed
+
+    def clear_hash(self):
+        self._tt.clear()
+
+    def close(self):
+        """رս̳زͷŹڴ"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self._control.release()
+        if self._control_shm is not None:
+            self._control_shm.close()
+            self._control_shm.unlink()
+        self._tt.close()
+
+
+def benchmark(worker_counts, max_depth, time_limit):
+    """
+    ͬµȵʱڵٶȣÿζӿûʼ
+    :return: [(, {: }, ڵ/)]
+    """
+    results = []
+    for workers in worker_counts:
+        computer = LazySMPAI(Line_Points, BLACK_CHESSMAN, workers=workers,
+                             time_limit=time_limit, max_depth=max_depth, verbose=False)
+        for chessman, point in BENCH_OPENING:
+            computer.position.make(chessman, point)
+        if workers > 1:
+            # ԤȽ̳أųʱ
+            computer._time_limit = 0.1
+            computer.AI_drop()
+            computer.position.unmake()
+            computer._time_limit = time_limit
+            computer.clear_hash()
+        computer.AI_drop()
+        results.append((workers, dict(computer.last_depth_times), computer.nodes_per_second()))
+        computer.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lazy SMP ")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="")
+    parser.add_argument("--time", type=float, default=DEFAULT_TIME_LIMIT, help="ÿ˼ʱ䣨룩")
+    parser.add_argument("--depth", type=int, default=DEFAULT_MAX_DEPTH, help="")
+    parser.add_argument("--bench", action="store_true", help="ȵʱڵٶı仯")
+    args = parser.parse_args()
+
+    if args.bench:
+        cpu_count = os.cpu_count() or 1
+        counts = sorted({1, 2, 4, cpu_count} | {args.workers})
+        results = benchmark(counts, args.depth, args.time)
+        depths = sorted({d for _, times, _ in results for d in times})
+        base_times = results[0][1]
+        print(" " + " ".join(f"{'' + str(d):>10}" for d in depths) + f" {'ڵ/':>10} {'ٱ':>8}")
+        for workers, times, nps in results:
+            cells = " ".join(f"{times[d]:>9.2f}s" if d in times else f"{'-':>10}" for d in depths)
+            # ٱ߶ɵһĺʱ
+            common = [d for d in depths if d in times and d in base_times]
+            speedup = base_times[common[-1]] / times[common[-1]] if common else 0.0
+            note = " (CPU)" if workers > cpu_count else ""
+            print(f"{workers:>6} {cells} {nps:>10.0f} {speedup:>8.2f}{note}")
+        return
+
+    def ai_factory(line_points, chessman, position):
+        return LazySMPAI(line_points, chessman, position, args.workers, args.time, args.depth)
+
+    gobang.main(ai_factory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+# -*- coding: gbk -*-
+
+# ؿMCTSң AI ʹͬ AI_drop ӿ
+
+import os
+import math
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import gobang
+from gobang import (
+    AI,
+    BENCH_OPENING,
+    BLACK_CHESSMAN,
+    WHITE_CHESSMAN,
+    Line_Points,
+    Position,
+    _get_next,
+)
+
+DEFAULT_PLAYOUTS = 2000  # Ĭÿģ
+UCT_C = 1.4  # UCT ̽ϵ
+MAX_CHILDREN = 12  # ÿڵֻչߵɺѡ
+ROLLOUT_DEPTH = 30  # ģΪ
+ROLLOUT_SAMPLE = 8  # ģʱÿȡĺѡѡߵ
+
+
+class _Node:
+    __slots__ = ("move", "chessman", "parent", "children", "untried", "visits", "wins", "terminal")
+
+    def __init__(self, move, chessman, parent):
+        self.move = move
+        # ߳ move һwins Ը÷ӽͳ
+        self.chessman = chessman
+        self.parent = parent
+        self.children = []
+        # δչĺѡ㣬Уpop() ȡ
+        self.untried = []
+        self.visits = 0
+        self.wins = 0.0
+        self.terminal = False
+
+    def select_child(self):
+        log_n = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda c: c.wins / c.visits + UCT_C * math.sqrt(log_n / c.visits),
+        )
+
+
+class _TreeSearch:
+    """һ Position  UCT ̽Ӷͨ make/unmake """
+
+    def __init__(self, position, seed=None, weights=None):
+        self._position = position
+        self._random = random.Random(seed)
+        # ÿһһ AI ֣_get_point_score ͬʱǽͷ
+        self._evaluators = {
+            BLACK_CHESSMAN.Value: AI(position.line_points, BLACK_CHESSMAN, position, weights),
+            WHITE_CHESSMAN.Value: AI(position.line_points, WHITE_CHESSMAN, position, weights),
+        }
+        self.playouts = 0
+
+    def run(self, chessman, playouts=None, time_limit=None):
+        """
+        Ϊ chessman ǰ
+        :param playouts: ģޣNone ʾ
+        :param time_limit: ʱޣ룩None ʾ
+        :return: ڵ
+        """
+        root = _Node(None, _get_next(chessman), None)
+        root.untried = self._ordered_moves(chessman)
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        while playouts is None or self.playouts < playouts:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self._iterate(root)
+            self.playouts += 1
+        return root
+
+    def _iterate(self, root):
+        position = self._position
+        node = root
+        depth = 0
+
+        try:
+            # ѡ
+            while not node.untried and node.children and not node.terminal:
+                node = node.select_child()
+                position.make(node.chessman, node.move)
+                depth += 1
+
+            # չ
+            if node.untried and not node.terminal:
+                move = node.untried.pop()
+                chessman = _get_next(node.chessman)
+                position.make(chessman, move)
+                depth += 1
+                child = _Node(move, chessman, node)
+                if position.is_win(move):
+                    # ʤţ÷һ£ѡ㲻
+                    child.terminal = True
+                    node.untried = []
+                    node.children = [child]
+                else:
+                    child.untried = self._ordered_moves(_get_next(chessman))
+                    if not child.untried:
+                        child.terminal = True  # 
+                    node.children.append(child)
+                node = child
+
+            # ģ
+            if node.terminal:
+                winner = node.chessman if position.is_win(node.move) else None
+            else:
+                winner = self._rollout(_get_next(node.chessman))
+
+            # ش
+            while node is not None:
+                node.visits += 1
+                if winner is None:
+                    node.wins += 0.5
+                elif winner == node.chessman:
+                    node.wins += 1
+                node = node.parent
+        finally:
+            # ʹ;ҲҪ̽ӣʱ̹
+            for _ in range(depth):
+                position.unmake()
+
+    def _ordered_moves(self, chessman):
+        evaluator = self._evaluators[chessman.Value]
+        scored = [(evaluator._get_point_score(p), p) for p in self._position.candidates()]
+        scored.sort(key=lambda item: item[0])
+        return [p for _, p in scored[-MAX_CHILDREN:]]
+
+    def _rollout(self, chessman):
+        position = self._position
+        made = 0
+        winner = None
+        try:
+            for _ in range(ROLLOUT_DEPTH):
+                moves = position.candidates()
+                if not moves:
+                    break
+                if len(moves) > ROLLOUT_SAMPLE:
+                    moves = self._random.sample(moves, ROLLOUT_SAMPLE)
+                move = max(moves, key=self._evaluators[chessman.Value]._get_point_score)
+                position.make(chessman, move)
+                made += 1
+                if position.is_win(move):
+                    winner = chessman
+                    break
+                chessman = _get_next(chessman)
+        finally:
+            for _ in range(made):
+                position.unmake()
+        return winner
+
+
+def _search_worker(line_points, moves, chessman, playouts, time_limit, seed, weights):
+    """̳еĸظڵӽڵ(ʴ, ʤ)ģ"""
+    position = Position(line_points)
+    for c, p in moves:
+        position.make(c, p)
+    search = _TreeSearch(position, seed, weights)
+    root = search.run(chessman, playouts, time_limit)
+    return {child.move: (child.visits, child.wins) for child in root.children}, search.playouts
+
+
+class MCTSAI(AI):
+    """
+    ؿңֱ滻 AI
+    :param playouts: ÿģNone ʾֻʱ
+    :param time_limit: ÿ˼ʱ䣨룩None ʾֻģ
+    :param workers: еĽ1 ʾڵǰ
+    :param weights: ģʹõֱ
+    :param verbose: Ƿӡÿģٶ
+    """
+
+    def __init__(self, line_points, chessman, position=None,
+                 playouts=DEFAULT_PLAYOUTS, time_limit=None, workers=1, weights=None, verbose=True):
+        if playouts is None and time_limit is None:
+            raise ValueError("playouts  time_limit ͬʱΪ None")
+        super().__init__(line_points, chessman, position, weights)
+        self._verbose = verbose
+        self._playouts = playouts
+        self._time_limit = time_limit
+        self._workers = max(1, workers)
+        self._executor = None
+        self.last_playouts = 0
+        self.last_elapsed = 0.0
+
+    def AI_drop(self):
+        start = time.perf_counter()
+        if self._workers == 1:
+            search = _TreeSearch(self._position, weights=self._weights)
+            root = search.run(self._my, self._playouts, self._time_limit)
+            stats = {child.move: (child.visits, child.wins) for child in root.children}
+            self.last_playouts = search.playouts
+        else:
+            stats, self.last_playouts = self._parallel_search()
+        self.last_elapsed = time.perf_counter() - start
+        if not stats:
+            # ԤһģҲûɣ˻̰
+            return super().AI_drop()
+
+        # ѡʴĵ
+        point = max(stats, key=lambda move: stats[move][0])
+        if self._verbose:
+            print(f"MCTS: {self.last_playouts} ģ, {self.playouts_per_second():.0f} /")
+        if self._owns_position:
+            self._position.make(self._my, point)
+        return point
+
+    def _parallel_search(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._workers)
+        playouts = None
+        if self._playouts is not None:
+            playouts = max(1, self._playouts // self._workers)
+        moves = list(self._position.moves)
+        futures = [
+            self._executor.submit(
+                _search_worker, self._line_points, moves, self._my,
+                playouts, self._time_limit, random.getrandbits(32), self._weights,
+            )
+            for _ in range(self._workers)
+        ]
+        # ϲ̸ڵͳ
+        merged = {}
+        total = 0
+        for future in futures:
+            stats, count = future.result()
+            total += count
+            for move, (visits, wins) in stats.items():
+                old_visits, old_wins = merged.get(move, (0, 0.0))
+                merged[move] = (old_visits + visits, old_wins + wins)
+        return merged, total
+
+    def playouts_per_second(self):
+        if self.last_elapsed <= 0:
+            return 0.0
+        return self.last_playouts / self.last_elapsed
+
+    def close(self):
+        """رս̳"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def benchmark(worker_counts, time_limit):
+    """
+    ͬµģٶ
+    :return: [(, /, ٱ)]
+    """
+    results = []
+    base = None
+    for workers in worker_counts:
+        computer = MCTSAI(Line_Points, BLACK_CHESSMAN, playouts=None,
+                          time_limit=time_limit, workers=workers, verbose=False)
+        for chessman, point in BENCH_OPENING:
+            computer.position.make(chessman, point)
+        # һԤȣų̳ʱ
+        if workers > 1:
+            computer._time_limit = 0.1
+            computer.AI_drop()
+            computer.position.unmake()
+            computer._time_limit = time_limit
+        computer.AI_drop()
+        pps = computer.playouts_per_second()
+        computer.close()
+        if base is None:
+            base = pps
+        results.append((workers, pps, pps / base if base else 0.0))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ؿ")
+    parser.add_argument("--playouts", type=int, default=DEFAULT_PLAYOUTS, help="ÿģ")
+    parser.add_argument("--time", type=float, default=None, help="ÿ˼ʱ䣨룩")
+    parser.add_argument("--workers", type=int, default=1, help="н")
+    parser.add_argument("--bench", action="store_true", help="ģٶı仯")
+    args = parser.parse_args()
+
+    if args.bench:
+        cpu_count = os.cpu_count() or 1
+        counts = sorted({1, 2, 4, cpu_count} | {args.workers})
+        for workers, pps, speedup in benchmark(counts, args.time or 2.0):
+            note = " (CPU)" if workers > cpu_count else ""
+            print(f"{workers} : {pps:.0f} /, ٱ {speedup:.2f}{note}")
+        return
+
+    def ai_factory(line_points, chessman, position):
+        playouts = args.playouts if args.time is None else None
+        return MCTSAI(line_points, chessman, position, playouts, args.time, args.workers)
+
+    gobang.main(ai_factory)
+
+
+if __name__ == "__main__":
+    main()
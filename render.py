@@ -0,0 +1,199 @@
+# -*- coding: gbk -*-
+
+# Ⱦ׵ÿһΪ PNG ͼƬҪʾ
+
+import os
+
+# ڳʼ pygame ʾģ֮ǰ
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+
+from gobang import (
+    BLACK_CHESSMAN,
+    WHITE_CHESSMAN,
+    BLACK_COLOR,
+    WHITE_COLOR,
+    RED_COLOR,
+    SCREEN_HEIGHT,
+    SIZE,
+    Start_X,
+    Start_Y,
+    Stone_Radius,
+    Point,
+    _draw_checkerboard,
+    _draw_chessman,
+)
+
+FRAMES_PER_TASK = 50  # װòзָͬ
+
+
+def load_record(path):
+    """
+    ȡףJSON ʽΪ [[x, y], ...]ڷ֡˫
+    :return: (chessman, point)Ԫб Checkerboard.history ͬ
+    """
+    with open(path, encoding="utf-8") as f:
+        moves = json.load(f)
+    return [
+        (BLACK_CHESSMAN if i % 2 == 0 else WHITE_CHESSMAN, Point(x, y))
+        for i, (x, y) in enumerate(moves)
+    ]
+
+
+class FrameRenderer:
+    """
+    סֻһβ棬ʱÿһֻ֡һӣ
+    һĺȦڸϣں֡
+    """
+
+    def __init__(self, move_numbers=True):
+        if not pygame.display.get_init():
+            pygame.display.init()
+        if not pygame.font.get_init():
+            pygame.font.init()
+        self._move_numbers = move_numbers
+        self._font = pygame.font.SysFont("SimHei", Stone_Radius)
+        self._base = pygame.Surface((SCREEN_HEIGHT, SCREEN_HEIGHT))
+        _draw_checkerboard(self._base)
+
+    def _draw_move(self, surface, number, chessman, point):
+        _draw_chessman(surface, point, chessman.Color)
+        if self._move_numbers:
+            color = WHITE_COLOR if chessman == BLACK_CHESSMAN else BLACK_COLOR
+            text = self._font.render(str(number), True, color)
+            center = (Start_X + SIZE * point.X, Start_Y + SIZE * point.Y)
+            surface.blit(text, text.get_rect(center=center))
+
+    def _highlight(self, surface, point):
+        """һĺȦӾ"""
+        return pygame.draw.circle(
+            surface,
+            RED_COLOR,
+            (Start_X + SIZE * point.X, Start_Y + SIZE * point.Y),
+            Stone_Radius + 2,
+            2
+        )
+
+    def render_step(self, record, step):
+        """׵ step 0 Ϊ̣ľ"""
+        return next(self.frames(record, step, step))[1]
+
+    def frames(self, record, start=0, end=None):
+        """
+        ɵ start  end Ļ
+        :return: ÿΪ(step, surface)surface һεʱᱻ
+        """
+        if end is None:
+            end = len(record)
+        # stones ֻۻӺţframe Ǽ˺Ȧ棻
+        # һʱֻ stones һȦڵС
+        stones = self._base.copy()
+        for i in range(start):
+            chessman, point = record[i]
+            self._draw_move(stones, i + 1, chessman, point)
+        frame = stones.copy()
+        ring = None
+        for step in range(start, end + 1):
+            if step > start:
+                chessman, point = record[step - 1]
+                if ring is not None:
+                    frame.blit(stones, ring, ring)
+                self._draw_move(stones, step, chessman, point)
+                self._draw_move(frame, step, chessman, point)
+            if step > 0:
+                ring = self._highlight(frame, record[step - 1][1])
+            yield step, frame
+
+
+def _frame_path(out_dir, step):
+    return os.path.join(out_dir, f"frame_{step:04d}.png")
+
+
+def export_frames(record, out_dir, start=0, end=None, renderer=None):
+    """
+    ѵ start  end Ϊ out_dir µ frame_0000.png ...
+    :return: ֡
+    """
+    if renderer is None:
+        renderer = FrameRenderer()
+    os.makedirs(out_dir, exist_ok=True)
+    count = 0
+    for step, surface in renderer.frames(record, start, end):
+        pygame.image.save(surface, _frame_path(out_dir, step))
+        count += 1
+    return count
+
+
+_worker_renderer = None
+
+
+def _export_worker(record, out_dir, start, end):
+    # ÿֻһȾûĿ
+    global _worker_renderer
+    if _worker_renderer is None:
+        _worker_renderer = FrameRenderer()
+    return export_frames(record, out_dir, start, end, _worker_renderer)
+
+
+def export_batch(jobs, workers=None):
+    """
+    еףÿְ FRAMES_PER_TASK зֺ
+    :param jobs: [(record, out_dir)]
+    :return: (֡, ֡/)
+    """
+    tasks = []
+    for record, out_dir in jobs:
+        start = 0
+        while start <= len(record):
+            end = min(start + FRAMES_PER_TASK - 1, len(record))
+            tasks.append((record, out_dir, start, end))
+            start = end + 1
+
+    begin = time.perf_counter()
+    if workers == 1:
+        total = sum(_export_worker(*task) for task in tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_export_worker, *task) for task in tasks]
+            total = sum(future.result() for future in futures)
+    elapsed = time.perf_counter() - begin
+    return total, total / elapsed if elapsed > 0 else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="׵Ϊ PNG ͼƬ")
+    parser.add_argument("records", nargs="+", help="ļJSON ʽ [[x, y], ...]")
+    parser.add_argument("--out", default="frames", help="Ŀ¼ÿһĿ¼")
+    parser.add_argument("--step", type=int, default=None, help="ָֻһͼ")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="н")
+    args = parser.parse_args()
+    if args.step is not None and args.step < 0:
+        parser.error("--step Ϊ")
+
+    jobs = []
+    for path in args.records:
+        name = os.path.splitext(os.path.basename(path))[0]
+        record = load_record(path)
+        if args.step is not None and args.step > len(record):
+            parser.error(f"{path} ֻ {len(record)} --step Χ")
+        jobs.append((record, os.path.join(args.out, name)))
+
+    if args.step is not None:
+        renderer = FrameRenderer()
+        for record, out_dir in jobs:
+            export_frames(record, out_dir, args.step, args.step, renderer)
+        return
+
+    total, fps = export_batch(jobs, args.workers)
+    print(f" {total} ֡, {fps:.1f} ֡/")
+
+
+if __name__ == "__main__":
+    main()
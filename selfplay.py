@@ -0,0 +1,80 @@
+# -*- coding: gbk -*-
+
+# Զģκͱʹã
+
+import random
+
+from gobang import (
+    BLACK_CHESSMAN,
+    WHITE_CHESSMAN,
+    Line_Points,
+    Point,
+    Position,
+    _get_next,
+)
+
+OPENING_RADIUS = 2  # ֻԪΧ÷Χ
+
+
+def make_openings(count, moves=4, seed=0, line_points=Line_Points):
+    """
+    ɹ̶֣Ծֽȡ AI_drop еѡ
+    :param count: ָ
+    :param moves: ÿֵĲڰ׽
+    :param seed: ӣͬһǵõͬһ鿪
+    :return: бÿΪ(chessman, point)Ԫб
+    """
+    rng = random.Random(seed)
+    center = line_points // 2
+    openings = []
+    while len(openings) < count:
+        opening = []
+        used = set()
+        for i in range(moves):
+            chessman = BLACK_CHESSMAN if i % 2 == 0 else WHITE_CHESSMAN
+            while True:
+                point = Point(
+                    center + rng.randint(-OPENING_RADIUS, OPENING_RADIUS),
+                    center + rng.randint(-OPENING_RADIUS, OPENING_RADIUS),
+                )
+                if point not in used:
+                    break
+            used.add(point)
+            opening.append((chessman, point))
+        openings.append(opening)
+    return openings
+
+
+def play_game(black_factory, white_factory, opening, line_points=Line_Points, seed=None):
+    """
+    һĶԾ
+    :param black_factory: ڷҵĿɵö󣬲 AI ͬ
+    :param white_factory: ׷ҵĿɵö
+    :param opening: ֣(chessman, point)Ԫб
+    :param seed: Ծѡʹõ
+    :return: ʤ巵 None
+    """
+    if seed is not None:
+        random.seed(seed)
+    position = Position(line_points)
+    players = {
+        BLACK_CHESSMAN.Value: black_factory(line_points, BLACK_CHESSMAN, position),
+        WHITE_CHESSMAN.Value: white_factory(line_points, WHITE_CHESSMAN, position),
+    }
+    for chessman, point in opening:
+        position.make(chessman, point)
+
+    chessman = _get_next(opening[-1][0]) if opening else BLACK_CHESSMAN
+    try:
+        while len(position.moves) < line_points * line_points:
+            point = players[chessman.Value].AI_drop()
+            if point is None:
+                break
+            position.make(chessman, point)
+            if position.is_win(point):
+                return chessman
+            chessman = _get_next(chessman)
+        return None
+    finally:
+        for player in players.values():
+            player.close()
@@ -0,0 +1,370 @@
+# -*- coding: gbk -*-
+
+# ֮ѭ/սжԾ̶֡֡SPRT ǰֹElo ϵ
+
+import os
+import json
+import math
+import hashlib
+import argparse
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from gobang import AI, BLACK_CHESSMAN
+from mcts import MCTSAI
+from lazysmp import DEFAULT_MAX_DEPTH, DEFAULT_TIME_LIMIT, LazySMPAI
+from selfplay import make_openings, play_game
+from tuning import load_weights
+
+ELO_SCALE = 400 / math.log(10)
+
+
+def make_factory(spec):
+    """
+    ôҹ
+    :param spec: ֵ䣬type Ϊ "ai""mcts"  "smp"ѡ weightsļ
+                 mcts  playoutstime smp  depthtimeworkers 
+    """
+    weights = load_weights(spec["weights"]) if spec.get("weights") else None
+    engine_type = spec.get("type", "ai")
+    if engine_type == "ai":
+        return partial(AI, weights=weights)
+    if engine_type == "mcts":
+        if spec.get("playouts") is None and spec.get("time") is None:
+            # ߶ûʱֹͣ
+            raise ValueError("mcts Ҫ playouts  time һ")
+        return partial(
+            MCTSAI,
+            playouts=spec.get("playouts"),
+            time_limit=spec.get("time"),
+            weights=weights,
+            verbose=False,
+        )
+    if engine_type == "smp":
+        return partial(
+            LazySMPAI,
+            workers=spec.get("workers", 1),
+            time_limit=spec.get("time", DEFAULT_TIME_LIMIT),
+            max_depth=spec.get("depth", DEFAULT_MAX_DEPTH),
+            weights=weights,
+            verbose=False,
+        )
+    raise ValueError(f"δ֪: {engine_type}")
+
+
+def spec_fingerprint(spec):
+    """õָƣֱļݼ룬дֱļָ֮ı"""
+    data = dict(spec)
+    data.setdefault("type", "ai")
+    if spec.get("weights"):
+        data["weights"] = list(load_weights(spec["weights"]))
+    text = json.dumps(data, sort_keys=True)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+def _game_worker(black_spec, white_spec, opening, seed):
+    """һ̶Ծ֣غڷ÷"""
+    winner = play_game(make_factory(black_spec), make_factory(white_spec), opening, seed=seed)
+    if winner is None:
+        return 0.5
+    return 1.0 if winner == BLACK_CHESSMAN else 0.0
+
+
+def schedule(names, mode, opening_count):
+    """
+    ɶԾֱÿ˫ִһ
+    :param mode: "roundrobin" Ծ֣"gauntlet" һÿöԾ
+    :return: [(game_id, a, b, opening_index, a_is_black)]
+    """
+    if mode == "roundrobin":
+        pairs = [(a, b) for i, a in enumerate(names) for b in names[i + 1:]]
+    elif mode == "gauntlet":
+        pairs = [(names[0], b) for b in names[1:]]
+    else:
+        raise ValueError(f"δ֪: {mode}")
+    games = []
+    # ȰٰУʹԵĶԾͬSPRT Ծж
+    for index in range(opening_count):
+        for a, b in pairs:
+            for a_is_black in (True, False):
+                game_id = f"{a}|{b}|{index}|{'b' if a_is_black else 'w'}"
+                games.append((game_id, a, b, index, a_is_black))
+    return games
+
+
+def load_results(path):
+    """
+    ȡļΪļͷõָƣÿһ̶Ծ
+    :return: (ļͷ, Ծּ¼б)ļʱļͷΪ None
+    """
+    header = None
+    results = []
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if "header" in record:
+                    header = record["header"]
+                else:
+                    results.append(record)
+    return header, results
+
+
+def _write_results(path, header, results):
+    # дʱļ滻жʱʧеĶԾ
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in [{"header": header}] + results:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
+
+
+def _check_header(header, results, seed, fingerprints):
+    """ļ뱾αĿӻͬòһʱܾ"""
+    if header is None:
+        if results:
+            raise ValueError("ļȱļͷ޷ȷ϶Ծ뻻һļ")
+        return
+    if header["seed"] != seed:
+        raise ValueError(f"ļĿΪ {header['seed']}뱾ε {seed} ͬ")
+    for name, fingerprint in fingerprints.items():
+        if header["engines"].get(name, fingerprint) != fingerprint:
+            raise ValueError(f" {name} ļеĲͬ뻻һļ")
+
+
+def _append_result(path, record):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def sprt_llr(scores, elo0, elo1):
+    """
+    SPRT Ȼȣ̬ƣscores Ϊһÿ̵ĵ÷
+    :return: H1Ϊ elo1 H0Ϊ elo0ĶȻ
+    """
+    if len(scores) < 2:
+        return 0.0
+    # һʤһԾ֣ȫʤȫȫʱҲΪ 0ж
+    n = len(scores) + 2
+    mean = (sum(scores) + 1) / n
+    variance = (sum(s * s for s in scores) + 1) / n - mean * mean
+    s0 = 1 / (1 + 10 ** (-elo0 / 400))
+    s1 = 1 / (1 + 10 ** (-elo1 / 400))
+    return n * (s1 - s0) * (2 * mean - s0 - s1) / (2 * variance)
+
+
+def _pair_scores(results, a, b):
+    scores = []
+    for record in results:
+        if record["a"] == a and record["b"] == b:
+            scores.append(record["score"])
+    return scores
+
+
+def _invert(matrix):
+    """Gauss-Jordan 棬"""
+    n = len(matrix)
+    a = [row[:] + [1.0 if i == j else 0.0 for j in range(n)] for i, row in enumerate(matrix)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+        a[col], a[pivot] = a[pivot], a[col]
+        scale = a[col][col]
+        a[col] = [v / scale for v in a[col]]
+        for r in range(n):
+            if r != col and a[r][col]:
+                factor = a[r][col]
+                a[r] = [v - factor * w for v, w in zip(a[r], a[col])]
+    return [row[n:] for row in a]
+
+
+def estimate_elo(names, results, iterations=200):
+    """
+     Bradley-Terry ģͣǰʤ EloƽΪ 0
+    ȡ log(gamma)  Fisher Ϣ֮棬㵽ƽΪ 0  Elo ϣ
+    ˿ÿʵĶ
+    :return: {name: (elo, 95% , Ծ, ÷)}
+    """
+    wins = {name: 0.0 for name in names}
+    games = {name: 0 for name in names}
+    pair_games = {}
+    for record in results:
+        a, b, score = record["a"], record["b"], record["score"]
+        wins[a] += score
+        wins[b] += 1 - score
+        games[a] += 1
+        games[b] += 1
+        key = (a, b) if a < b else (b, a)
+        pair_games[key] = pair_games.get(key, 0) + 1
+
+    # MM ǿ gammaÿһǿΪ 1 ֵĺ壬ȫʤȫʱɢ
+    gamma = {name: 1.0 for name in names}
+    for _ in range(iterations):
+        new_gamma = {}
+        for name in names:
+            denominator = 1.0 / (gamma[name] + 1.0)
+            for (x, y), n in pair_games.items():
+                if name in (x, y):
+                    denominator += n / (gamma[x] + gamma[y])
+            new_gamma[name] = (wins[name] + 0.5) / denominator
+        gamma = new_gamma
+
+    elos = {name: ELO_SCALE * math.log(gamma[name]) for name in names}
+    mean_elo = sum(elos.values()) / len(elos)
+
+    # Fisher Ϣÿһ (i, j)I_ii += n p qI_ij -= n p qֻԽ
+    index = {name: i for i, name in enumerate(names)}
+    k = len(names)
+    information = [[0.0] * k for _ in range(k)]
+    for name in names:
+        p = gamma[name] / (gamma[name] + 1.0)
+        information[index[name]][index[name]] += p * (1 - p)
+    for (x, y), n in pair_games.items():
+        p = gamma[x] / (gamma[x] + gamma[y])
+        w = n * p * (1 - p)
+        i, j = index[x], index[y]
+        information[i][i] += w
+        information[j][j] += w
+        information[i][j] -= w
+        information[j][i] -= w
+    covariance = _invert(information)
+    total = sum(map(sum, covariance))
+
+    table = {}
+    for name in names:
+        i = index[name]
+        # ȥƽֵķC_ii - 2/k * sum_j C_ij + 1/k^2 * sum C
+        variance = covariance[i][i] - 2 * sum(covariance[i]) / k + total / (k * k)
+        error = 1.96 * ELO_SCALE * math.sqrt(max(variance, 0.0))
+        n = games[name]
+        score = wins[name] / n if n else 0.5
+        table[name] = (elos[name] - mean_elo, error, n, score)
+    return table
+
+
+def run_tournament(engines, mode, opening_count, workers, results_path,
+                   sprt=None, seed=0):
+    """
+    б׷ӵ results_pathʱɵĶԾ֣
+    ӻͬļһʱ׳ ValueError
+    :param engines: {name: spec}
+    :param sprt: None  (elo0, elo1, alpha, beta)ĳжΪ䰲ŶԾ
+    :return: ȫԾֽ
+    """
+    names = list(engines)
+    # ǰãڽ̳вű¶
+    for spec in engines.values():
+        make_factory(spec)
+    openings = make_openings(opening_count, seed=seed)
+    fingerprints = {name: spec_fingerprint(spec) for name, spec in engines.items()}
+    header, results = load_results(results_path)
+    _check_header(header, results, seed, fingerprints)
+    # ¼¼ãƳñָƣ¼ʱԻ
+    known = dict(header["engines"]) if header else {}
+    known.update(fingerprints)
+    if header is None or known != header["engines"]:
+        _write_results(results_path, {"seed": seed, "engines": known}, results)
+
+    # ֻʹñζԾֱеĽƳáƻĿֶ
+    games = schedule(names, mode, opening_count)
+    scheduled = {game[0] for game in games}
+    results = [record for record in results if record["id"] in scheduled]
+    done = {record["id"] for record in results}
+    if done:
+        print(f" {len(done)} ̣")
+    pending = [game for game in games if game[0] not in done]
+
+    decided = set()
+
+    def check_sprt(a, b):
+        if sprt is None or (a, b) in decided:
+            return
+        elo0, elo1, alpha, beta = sprt
+        llr = sprt_llr(_pair_scores(results, a, b), elo0, elo1)
+        if llr >= math.log((1 - beta) / alpha):
+            decided.add((a, b))
+            print(f"SPRT: {a}  {b}  H1 (LLR {llr:.2f})")
+        elif llr <= math.log(beta / (1 - alpha)):
+            decided.add((a, b))
+            print(f"SPRT: {a}  {b}  H0 (LLR {llr:.2f})")
+
+    for a, b in {(record["a"], record["b"]) for record in results}:
+        check_sprt(a, b)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        running = {}
+        while pending or running:
+            # ÿ̶жԾ֣ SPRT ж
+            while pending and len(running) < workers * 2:
+                game_id, a, b, index, a_is_black = pending.pop(0)
+                if (a, b) in decided:
+                    continue
+                black, white = (a, b) if a_is_black else (b, a)
+                future = executor.submit(
+                    _game_worker, engines[black], engines[white], openings[index],
+                    seed * 1000003 + index,
+                )
+                running[future] = (game_id, a, b, index, a_is_black)
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                game_id, a, b, index, a_is_black = running.pop(future)
+                black_score = future.result()
+                record = {
+                    "id": game_id,
+                    "a": a,
+                    "b": b,
+                    "opening": index,
+                    "a_is_black": a_is_black,
+                    "score": black_score if a_is_black else 1 - black_score,
+                }
+                results.append(record)
+                _append_result(results_path, record)
+                check_sprt(a, b)
+    return results
+
+
+def print_table(names, results):
+    table = estimate_elo(names, results)
+    print(f"{'':<4} {'':<20} {'Elo':>8} {'':>8} {'Ծ':>6} {'÷':>8}")
+    ranked = sorted(names, key=lambda name: table[name][0], reverse=True)
+    for rank, name in enumerate(ranked, 1):
+        elo, error, n, score = table[name]
+        print(f"{rank:<4} {name:<20} {elo:>8.1f} {'':>1}{error:>7.1f} {n:>6} {score * 100:>7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ұ Elo ")
+    parser.add_argument("engines", help=" JSON ļʽΪ {: }")
+    parser.add_argument("--mode", choices=("roundrobin", "gauntlet"), default="roundrobin")
+    parser.add_argument("--openings", type=int, default=50, help="ỵ̈")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="н")
+    parser.add_argument("--results", default="tournament_results.jsonl", help="Ծֽļ")
+    parser.add_argument("--seed", type=int, default=0, help="")
+    parser.add_argument("--sprt", type=float, nargs=2, metavar=("ELO0", "ELO1"),
+                        help="ÿ SPRT 飬жǰ")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with open(args.engines, encoding="utf-8") as f:
+        engines = json.load(f)
+    sprt = None
+    if args.sprt:
+        sprt = (args.sprt[0], args.sprt[1], args.alpha, args.beta)
+
+    try:
+        results = run_tournament(engines, args.mode, args.openings, args.workers,
+                                 args.results, sprt, args.seed)
+    except ValueError as error:
+        parser.error(str(error))
+    print_table(list(engines), results)
+
+
+if __name__ == "__main__":
+    main()
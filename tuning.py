@@ -0,0 +1,143 @@
+# -*- coding: gbk -*-
+
+#  SPSA Զĵ AI ֱԾڽ̳внУȱ浽̿ɶϵ
+
+import os
+import json
+import math
+import random
+import argparse
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+from gobang import AI, BLACK_CHESSMAN, DEFAULT_WEIGHTS, Weights
+from selfplay import make_openings, play_game
+
+# SPSA a_k = SPSA_A / (k + 1 + SPSA_STABILITY) ** 0.602c_k = SPSA_C / (k + 1) ** 0.101
+# ڶռеc_k = 0.2 ԼÿȨ¸ 20%
+SPSA_A = 0.5
+SPSA_C = 0.2
+SPSA_STABILITY = 10
+
+
+def load_weights(path):
+    """ӵ JSON ļȡֱ"""
+    with open(path, encoding="utf-8") as f:
+        return Weights(**json.load(f)["weights"])
+
+
+def _to_theta(weights):
+    return [math.log(value) for value in weights]
+
+
+def _to_weights(theta):
+    # ȨزС 1֤ GapDivisor ѷŴ
+    return Weights(*(math.exp(max(0.0, t)) for t in theta))
+
+
+def _game_worker(weights_a, weights_b, opening, a_is_black, seed):
+    """һ a  b ĶԾ֣ a ĵ÷֣ʤ 1 0.5 0"""
+    factory_a = partial(AI, weights=weights_a)
+    factory_b = partial(AI, weights=weights_b)
+    if a_is_black:
+        winner = play_game(factory_a, factory_b, opening, seed=seed)
+    else:
+        winner = play_game(factory_b, factory_a, opening, seed=seed)
+    if winner is None:
+        return 0.5
+    return 1.0 if (winner == BLACK_CHESSMAN) == a_is_black else 0.0
+
+
+def run_match(executor, weights_a, weights_b, openings, seed=0):
+    """
+    a  b ÿϸִڡִһ
+    :return: a ƽ÷֣Χ [0, 1]
+    """
+    futures = [
+        executor.submit(_game_worker, weights_a, weights_b, opening, a_is_black, seed + i)
+        for i, opening in enumerate(openings)
+        for a_is_black in (True, False)
+    ]
+    return sum(future.result() for future in futures) / len(futures)
+
+
+def _load_checkpoint(path, seed):
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        print(f"ӵ {state['iteration']} ּ")
+        return state
+    return {"seed": seed, "iteration": 0, "theta": _to_theta(DEFAULT_WEIGHTS), "history": []}
+
+
+def _save_json(path, data):
+    # дʱļ滻жʱ²ļ
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def spsa(iterations, games, workers, checkpoint=None, seed=0):
+    """
+    SPSA ΣÿְѲŶĵĽݶ
+    :param iterations: ѱ
+    :param games: ÿֵĿÿ˫ִһ
+    :param checkpoint: ļ·ʱлָ
+    :return: ֱ
+    """
+    state = _load_checkpoint(checkpoint, seed)
+    theta = state["theta"]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for k in range(state["iteration"], iterations):
+            rng = random.Random(state["seed"] * 1000003 + k)
+            a_k = SPSA_A / (k + 1 + SPSA_STABILITY) ** 0.602
+            c_k = SPSA_C / (k + 1) ** 0.101
+            delta = [rng.choice((-1, 1)) for _ in theta]
+            plus = _to_weights([t + c_k * d for t, d in zip(theta, delta)])
+            minus = _to_weights([t - c_k * d for t, d in zip(theta, delta)])
+
+            openings = make_openings(games, seed=rng.getrandbits(32))
+            score = run_match(executor, plus, minus, openings, seed=rng.getrandbits(32))
+            gradient = (2 * score - 1) / (2 * c_k)
+            # theta ͬضϵ 0޵ĲԽƯԽԶ
+            theta = [max(0.0, t + a_k * gradient * d) for t, d in zip(theta, delta)]
+
+            state["iteration"] = k + 1
+            state["theta"] = theta
+            state["history"].append({"iteration": k + 1, "score": score})
+            if checkpoint:
+                _save_json(checkpoint, state)
+            print(f" {k + 1}/{iterations} : Ŷ÷ {score:.3f}")
+    return _to_weights(theta)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ԶĵAIֱ")
+    parser.add_argument("--iterations", type=int, default=200, help="SPSA ")
+    parser.add_argument("--games", type=int, default=8, help="ÿֿỵ̈")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="н")
+    parser.add_argument("--seed", type=int, default=0, help="")
+    parser.add_argument("--checkpoint", default="tuning_checkpoint.json", help="ļ")
+    parser.add_argument("--output", default="tuned_weights.json", help="ֱ")
+    parser.add_argument("--verify", type=int, default=0,
+                        help="νĬֱĵĿ0 ʾ֤")
+    args = parser.parse_args()
+
+    weights = spsa(args.iterations, args.games, args.workers, args.checkpoint, args.seed)
+    result = {"weights": {name: round(value, 2) for name, value in weights._asdict().items()}}
+
+    if args.verify:
+        openings = make_openings(args.verify, seed=args.seed + 1)
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            score = run_match(executor, weights, DEFAULT_WEIGHTS, openings)
+        result["score_vs_default"] = score
+        print(f"Ĭֱ÷: {score:.3f}")
+
+    _save_json(args.output, result)
+    for name, value in result["weights"].items():
+        print(f"{name:>14}: {value}")
+
+
+if __name__ == "__main__":
+    main()